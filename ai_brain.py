@@ -1,11 +1,30 @@
 import os
-import google.generativeai as genai
-from dotenv import load_dotenv
-
-load_dotenv()
+import json
+import hashlib
+from ttl_cache import TTLCache
+
+# Local dev reads .env; on Vercel the host injects env vars, so skip the file parse
+if not os.getenv("VERCEL"):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
+# Static instruction for the dashboard analysis; bound to the model once so
+# each request only sends the dynamic portfolio context.
+ANALYSIS_INSTRUCTION = "Act as a Portfolio Mentor. Analyze this safely. Output ONLY in Markdown Sections (**1. Observations**, **2. Risks**, **3. Actions**, **4. Mentor's Note**)."
+
+# Gemini client is configured once per process, and only when a key is present
+if GEMINI_API_KEY:
+    import google.generativeai as genai
+    genai.configure(api_key=GEMINI_API_KEY)
+    _MODEL = genai.GenerativeModel('gemini-1.5-flash', system_instruction=ANALYSIS_INSTRUCTION)
+else:
+    _MODEL = None
+
 SYSTEM_PROMPT = """
 You are the AI Portfolio Brain of a long-term investment analysis platform.
 
@@ -177,7 +196,49 @@ ALLOWED ACTIONS:
 - "Tier-1 shows the map. Tier-2 teaches how to travel calmly."
 """
 
-def analyze_portfolio(summary: dict, question: str = None, risk_data: dict = None, alerts: list = None, market_data: dict = None):
+# --- FALLBACK MARKDOWN TEMPLATES ---
+# Static pieces of the local analysis, resolved once at import.
+OBS_HEADER = "**1. Observations**\n"
+RISK_HEADER = "\n**2. Risks**\n"
+ACTION_HEADER = "\n**3. Actions**\n"
+NOTE_SECTION = "\n**4. Mentor's Note**\nStay disciplined. Focus on your long-term goals, not short-term noise."
+
+REGIME_RISKS = {
+    "ELEVATED_VOLATILITY": ("Market Volatility: The VIX is elevated. Expect swinging prices.",),
+    "STAGFLATION_RISK": ("Macro Stress: High inflation/rates risk signaled by bond markets.",),
+}
+
+DEFAULT_ACTION = "Review sector allocation for rebalancing opportunities."
+REGIME_ACTIONS = {
+    "NORMAL": DEFAULT_ACTION,
+    "ELEVATED_VOLATILITY": "Avoid panic selling. Review stop-loss levels.",
+    "STAGFLATION_RISK": "Consider hedging positions or increasing Cash/Gold exposure.",
+}
+
+# --- ANALYSIS CACHE ---
+# Repeated dashboard refreshes for an unchanged portfolio reuse the last answer.
+ANALYSIS_CACHE_TTL = 300  # seconds
+ANALYSIS_CACHE_MAXSIZE = 512
+_analysis_cache = TTLCache(ttl=ANALYSIS_CACHE_TTL, maxsize=ANALYSIS_CACHE_MAXSIZE)
+
+def _analysis_cache_key(summary: dict, question: str, risk_data: dict, alerts: list, regime: str) -> str:
+    payload = {
+        # Exact figures: they are printed verbatim in the observations
+        "tv": summary.get('total_value', 0),
+        "pnl": summary.get('unrealized_pnl', 0),
+        "down": summary.get('day_change', 0) < 0,
+        "regime": regime,
+        "risk": risk_data.get('risk_label', 'Moderate') if risk_data else None,
+        "reasons": risk_data.get('risk_reasons', []) if risk_data else [],
+        "alerts": bool(alerts),
+        "q": question,
+    }
+    return hashlib.blake2b(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def clear_analysis_cache():
+    _analysis_cache.clear()
+
+async def analyze_portfolio(summary: dict, question: str = None, risk_data: dict = None, alerts: list = None, market_data: dict = None):
     """
     Analyzes portfolio using AI or Robust Fallback.
     Returns STRING (Markdown) for the Dashboard.
@@ -187,6 +248,12 @@ def analyze_portfolio(summary: dict, question: str = None, risk_data: dict = Non
     # We construct a high-quality response locally if the API is offline
     
     regime = market_data.get('regime', 'NORMAL') if market_data else 'NORMAL'
+
+    cache_key = _analysis_cache_key(summary, question, risk_data, alerts, regime)
+    cached = _analysis_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     total_val = summary.get('total_value', 0)
     pnl = summary.get('unrealized_pnl', 0)
     
@@ -200,11 +267,7 @@ def analyze_portfolio(summary: dict, question: str = None, risk_data: dict = Non
         obs.append("Daily performance is positive.")
 
     # 2. Risks
-    risks = []
-    if regime == "ELEVATED_VOLATILITY":
-        risks.append("Market Volatility: The VIX is elevated. Expect swinging prices.")
-    elif regime == "STAGFLATION_RISK":
-        risks.append("Macro Stress: High inflation/rates risk signaled by bond markets.")
+    risks = list(REGIME_RISKS.get(regime, ()))
     
     if risk_data:
         r_label = risk_data.get('risk_label', 'Moderate')
@@ -217,43 +280,33 @@ def analyze_portfolio(summary: dict, question: str = None, risk_data: dict = Non
         risks.append("No critical structural risks detected at this time.")
 
     # 3. Actions
-    actions = []
-    if regime == "STAGFLATION_RISK":
-        actions.append("Consider hedging positions or increasing Cash/Gold exposure.")
-    elif regime == "ELEVATED_VOLATILITY":
-        actions.append("Avoid panic selling. Review stop-loss levels.")
-    else:
-        actions.append("Review sector allocation for rebalancing opportunities.")
+    actions = [REGIME_ACTIONS.get(regime, DEFAULT_ACTION)]
     
     if alerts:
         actions.append("Review the specific concentration alerts highlighted above.")
 
-    # 4. Note
-    note = "Stay disciplined. Focus on your long-term goals, not short-term noise."
-
     # Construct Markdown Payload
-    md = "**1. Observations**\n"
-    for o in obs: md += f"* {o}\n"
+    parts = [OBS_HEADER]
+    parts.extend(f"* {o}\n" for o in obs)
     
-    md += "\n**2. Risks**\n"
-    for r in risks: md += f"* {r}\n"
+    parts.append(RISK_HEADER)
+    parts.extend(f"* {r}\n" for r in risks)
     
-    md += "\n**3. Actions**\n"
-    for a in actions: md += f"* {a}\n"
+    parts.append(ACTION_HEADER)
+    parts.extend(f"* {a}\n" for a in actions)
     
-    md += "\n**4. Mentor's Note**\n"
-    md += f"{note}"
+    parts.append(NOTE_SECTION)
+    md = "".join(parts)
     
     # TRY API (Optional - can be skipped if we know it's broken, but good to keep hook)
-    if GEMINI_API_KEY and not question: # Only simple mode for now
+    if _MODEL and not question: # Only simple mode for now
         try:
-            genai.configure(api_key=GEMINI_API_KEY)
-            model = genai.GenerativeModel('gemini-pro')
-            prompt = f"Act as a Portfolio Mentor. Analyze this safely. Output ONLY in Markdown Sections (**1. Observations**, **2. Risks**, **3. Actions**, **4. Mentor's Note**). Context: Portfolio Value {total_val}, Market Regime {regime}, Risks: {risks}"
+            prompt = f"Context: Portfolio Value {total_val}, Market Regime {regime}, Risks: {risks}"
             
-            # response = model.generate_content(prompt) # Commented out to force robust local mode for demo stability
+            # response = await _MODEL.generate_content_async(prompt) # Commented out to force robust local mode for demo stability
             # return response.text
         except:
             pass
             
+    _analysis_cache.set(cache_key, md)
     return md
@@ -1,14 +1,15 @@
-from fastapi import FastAPI, HTTPException, Request, Header
+import asyncio
+from fastapi import FastAPI, Request
 from fastapi.responses import RedirectResponse, HTMLResponse
 from pydantic import BaseModel
 from pathlib import Path
-from zerodha import get_portfolio_summary, set_access_token, get_login_url, generate_session
-from ai_brain import analyze_portfolio
+from zerodha import get_portfolio_summary, set_access_token, get_login_url, generate_session, clear_portfolio_cache
+from ai_brain import analyze_portfolio, clear_analysis_cache
 from scheduler import start_scheduler
-from models import PortfolioSnapshot, AIAnalysisResponse, AIRequest
+from models import AIAnalysisResponse, AIRequest, MarketContextResponse
 from risk_engine import calculate_risk_score, check_concentration_alerts
 from market_engine import get_market_context
-from stock_engine import get_stock_intelligence
+from stock_engine import get_stock_intelligence, get_stock_intelligence_batch, clear_intelligence_cache
 from fastapi.middleware.cors import CORSMiddleware
 
 app = FastAPI(title="AI Portfolio Brain")
@@ -26,8 +27,10 @@ class TokenRequest(BaseModel):
     access_token: str
 
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
     start_scheduler()
+    # Warm the market context off the request path so the first user hits a filled cache
+    app.state.warmup_task = asyncio.create_task(asyncio.to_thread(get_market_context))
 
 @app.get("/")
 def health():
@@ -69,6 +72,14 @@ def update_token(req: TokenRequest):
     set_access_token(req.access_token)
     return {"status": "Token updated"}
 
+@app.post("/cache/clear")
+def cache_clear():
+    """Drops cached AI analyses, portfolio snapshots and stock intelligence so the next request is recomputed."""
+    clear_analysis_cache()
+    clear_portfolio_cache()
+    clear_intelligence_cache()
+    return {"status": "Cache cleared"}
+
 # --- NEW ENDPOINTS (AI-Sector Phase 1) ---
 
 @app.get("/stock/{symbol}/intelligence")
@@ -79,7 +90,16 @@ def stock_intel(symbol: str):
     """
     return get_stock_intelligence(symbol)
 
-@app.get("/market/mood")
+@app.get("/stocks/intelligence")
+async def stocks_intel(symbols: str):
+    """
+    Batch variant of /stock/{symbol}/intelligence (prices fetched in parallel).
+    Example: /stocks/intelligence?symbols=RELIANCE,TCS,INFY
+    """
+    symbol_list = [s.strip() for s in symbols.split(",") if s.strip()]
+    return await get_stock_intelligence_batch(symbol_list)
+
+@app.get("/market/mood", response_model=MarketContextResponse)
 def market_mood():
     """
     Returns the current market regime and signals (VIX, Yields, etc.).
@@ -87,49 +107,37 @@ def market_mood():
     """
     return get_market_context()
 
-@app.get("/market-context")
+@app.get("/market-context", response_model=MarketContextResponse)
 def market_context():
     return get_market_context()
 
+# Market Regime -> Portfolio Risk Status (any other regime is "High")
+RISK_STATUS_BY_REGIME = {"NORMAL": "Low", "ELEVATED_VOLATILITY": "Moderate"}
+
 @app.get("/portfolio")
 def portfolio():
-    data = get_portfolio_summary()
+    data = dict(get_portfolio_summary())  # Copy: the summary may be a shared cached snapshot
     
     # Dynamic Risk Status based on Market Regime
-    try:
-        from market_engine import get_market_context
-        ctx = get_market_context()
-        regime = ctx.get("regime", "NORMAL")
-        
-        if regime == "NORMAL":
-            data["risk_status"] = "Low"
-        elif regime == "ELEVATED_VOLATILITY":
-            data["risk_status"] = "Moderate"
-        else:
-            data["risk_status"] = "High"
-    except:
-        data["risk_status"] = "Moderate" # Fallback
+    regime = get_market_context().get("regime", "NORMAL")
+    data["risk_status"] = RISK_STATUS_BY_REGIME.get(regime, "High")
         
     return data
 
-from risk_engine import calculate_risk_score, check_concentration_alerts
-from market_engine import get_market_context
-
-# ...
-
 @app.post("/ai-analysis", response_model=AIAnalysisResponse)
-def ai_analysis(req: AIRequest = None):
-    portfolio_data = get_portfolio_summary()
+async def ai_analysis(req: AIRequest = None):
+    # Fetch Portfolio & Market Regime concurrently (both are blocking I/O)
+    portfolio_data, market_data = await asyncio.gather(
+        asyncio.to_thread(get_portfolio_summary),
+        asyncio.to_thread(get_market_context),
+    )
     
     # Calculate Risk & Alerts
     risk_data = calculate_risk_score(portfolio_data)
     alerts = check_concentration_alerts(portfolio_data)
     
-    # Get Market Regime
-    market_data = get_market_context()
-    
     question = req.question if req else None
     
     # Pass risk & market info to AI
-    analysis = analyze_portfolio(portfolio_data, question=question, risk_data=risk_data, alerts=alerts, market_data=market_data)
+    analysis = await analyze_portfolio(portfolio_data, question=question, risk_data=risk_data, alerts=alerts, market_data=market_data)
     return {"analysis": analysis}
@@ -1,25 +1,45 @@
 import time
-import requests
+import bisect
+import threading
 import random
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Optional
+from datetime import datetime
 
 # --- CACHE MECHANISM ---
+@dataclass(slots=True)
 class MarketDataCache:
-    def __init__(self, ttl_minutes=15):
-        self.ttl = ttl_minutes * 60
-        self.data = None
-        self.last_updated = 0
+    ttl: float = 900.0  # seconds
+    data: Optional[MappingProxyType] = None
+    last_updated: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
 
     def get(self):
-        if self.data and (time.time() - self.last_updated < self.ttl):
+        if self.data and (time.monotonic() - self.last_updated < self.ttl):
             return self.data
         return None
 
     def set(self, data):
-        self.data = data
-        self.last_updated = time.time()
-
-market_cache = MarketDataCache(ttl_minutes=15)
+        # Stamp once per refresh; readers share a read-only view of the payload
+        data["timestamp"] = datetime.now().isoformat()
+        self.data = MappingProxyType(data)
+        self.last_updated = time.monotonic()
+
+market_cache = MarketDataCache(ttl=15 * 60)
+
+# --- SIMULATION TABLES ---
+_rng = random.Random()
+
+# Stress level cut-offs on a uniform roll: Calm < 0.6 <= Caution < 0.9 <= Panic
+_STRESS_THRESHOLDS = (0.6, 0.9)
+# Per stress level: (VIX range, drawdown range, bond yield trend)
+_STRESS_BANDS = (
+    ((11, 16), (0, 3), "STABLE"),   # Calm
+    ((17, 22), (3, 8), "UP"),       # Caution
+    ((23, 35), (8, 15), "UP"),      # Panic/Stress
+)
+_OIL_TRENDS = ("UP", "DOWN", "STABLE")
 
 def fetch_live_signals():
     """
@@ -30,30 +50,20 @@ def fetch_live_signals():
         # Generate dynamic market conditions.
         
         # 1. Randomize "Stress Level" (0=Calm, 1=Nervous, 2=Panic)
-        stress_seed = random.random()
+        stress_seed, vix_draw, dd_draw, oil_draw = [_rng.random() for _ in range(4)]
         
-        sim_vix = 14.0
-        drawdown = 2.0
+        band = _STRESS_BANDS[bisect.bisect_right(_STRESS_THRESHOLDS, stress_seed)]
+        (vix_lo, vix_hi), (dd_lo, dd_hi), yield_trend = band
         
-        if stress_seed < 0.6: # Calm
-             sim_vix = random.uniform(11, 16)
-             drawdown = random.uniform(0, 3)
-             yield_trend = "STABLE"
-        elif stress_seed < 0.9: # Caution
-             sim_vix = random.uniform(17, 22)
-             drawdown = random.uniform(3, 8)
-             yield_trend = "UP"
-        else: # Panic/Stress
-             sim_vix = random.uniform(23, 35)
-             drawdown = random.uniform(8, 15)
-             yield_trend = "UP"
+        sim_vix = vix_lo + (vix_hi - vix_lo) * vix_draw
+        drawdown = dd_lo + (dd_hi - dd_lo) * dd_draw
              
         return {
             "vix": round(sim_vix, 2),
             "index_drawdown": round(drawdown, 2),
             "interest_rates_trend": "STABLE",
             "bond_yields_trend": yield_trend,
-            "oil_prices_trend": random.choice(["UP", "DOWN", "STABLE"]),
+            "oil_prices_trend": _OIL_TRENDS[int(oil_draw * len(_OIL_TRENDS))],
             "market_index": 24500.00,
             "is_simulated": True
         }
@@ -71,113 +81,43 @@ def fetch_live_signals():
         }
 
 def get_macro_signals():
-    # Check cache first
-    cached = market_cache.get()
-    if cached:
-        return cached
-    
-    # Fetch live
-    signals = fetch_live_signals()
-    market_cache.set(signals)
-    return signals
-
-def determine_regime(signals):
+    return get_market_context()["signals"]
+
+# --- REGIME SCORING ---
+# Stress indicators packed into one int (bit set = indicator active)
+VIX_HIGH, DRAWDOWN_HIGH, RATES_UP, YIELDS_UP, OIL_UP = 1, 2, 4, 8, 16
+_REGIME_MASK = VIX_HIGH | DRAWDOWN_HIGH | RATES_UP | YIELDS_UP
+
+# Regime code -> (label, reasons)
+_REGIMES = (
+    ("NORMAL", ("Market indicators are stable.",)),
+    ("ELEVATED_VOLATILITY", ("Volatility or drawdown detected.",)),
+    ("STAGFLATION_RISK", ("High volatility and negative trend confluence.",)),
+)
+# Stress score (0-4) -> regime code: 0 = Normal, 1-2 = Elevated, 3+ = Stagflation
+_CODE_BY_SCORE = (0, 1, 1, 2, 2)
+
+def signal_bits(signals):
+    """Packs the stress indicators of a signals dict into a bitmask."""
+    bits = VIX_HIGH if signals.get('vix', 0) > 20 else 0
+    if signals.get('index_drawdown', 0) > 5.0: bits |= DRAWDOWN_HIGH
+    if signals.get('interest_rates_trend') == 'UP': bits |= RATES_UP
+    if signals.get('bond_yields_trend') == 'UP': bits |= YIELDS_UP
+    if signals.get('oil_prices_trend') == 'UP': bits |= OIL_UP
+    return bits
+
+def _regime_for_bits(bits):
+    return _REGIMES[_CODE_BY_SCORE[bin(bits & _REGIME_MASK).count("1")]]
+
+def determine_regime(signals, bits=None):
     """
     Regime Scoring Logic (Same as specified):
     +1 for each stress indicator
     """
-    score = 0
-    if signals.get('vix', 0) > 20: score += 1
-    if signals.get('index_drawdown', 0) > 5.0: score += 1
-    if signals.get('interest_rates_trend') == 'UP': score += 1
-    if signals.get('bond_yields_trend') == 'UP': score += 1
-    
-    if score == 0: return "NORMAL", ["Market indicators are stable."]
-    if score <= 2: return "ELEVATED_VOLATILITY", ["Volatility or drawdown detected."]
-    return "STAGFLATION_RISK", ["High volatility and negative trend confluence."]
-
-def get_sector_impacts(regime, signals):
-    """
-    Returns specific sector advice based on regime.
-    """
-    impacts = {}
-    
-    bond_yields_trend = signals.get('bond_yields_trend', 'STABLE')
-    oil_prices_trend = signals.get('oil_prices_trend', 'STABLE')
-    
-    if regime == 'NORMAL':
-        impacts['Technology'] = 'Positive (Risk On)'
-        impacts['Financials'] = 'Positive (Credit Growth)'
-        impacts['Healthcare'] = 'Neutral'
-        
-    elif regime == 'ELEVATED_VOLATILITY':
-        impacts['Technology'] = 'Negative (Valuation Pressure)' if bond_yields_trend == 'UP' else 'Neutral'
-        impacts['FMCG'] = 'Positive (Defensive Rotation)'
-        impacts['Pharma'] = 'Positive (Safety)'
-        
-    else: # STAGFLATION/STRESS
-        impacts['Technology'] = 'Negative (High Risk)'
-        impacts['Financials'] = 'Negative (NPA Risks)'
-        impacts['Metals'] = 'Positive (Inflation Hedge)'
-        
-    # Oil Specific
-    if oil_prices_trend == 'UP':
-        impacts['Oil & Gas'] = 'Positive (Margin Expansion)'
-        impacts['Paints'] = 'Negative (Input Costs)'
-        impacts['Aviation'] = 'Negative (Fuel Costs)'
-        
-    return impacts
-
-def get_market_context():
-    signals = get_macro_signals()
-    regime = determine_regime(signals)
-    impacts = get_sector_impacts(regime, signals)
-    
-    return {
-        "regime": regime,
-        "signals": signals,
-        "impact_map": impacts,
-        "timestamp": datetime.now().isoformat()
-    }
-    score = 0
-    reasons = []
-    
-    # 1. Volatility
-    if signals.get('vix', 0) > 15: 
-        score += 1
-        reasons.append(f"VIX Elevated ({signals['vix']})")
-
-    # 2. Drawdown
-    if signals.get('index_drawdown', 0) > 7: 
-        score += 1
-        reasons.append(f"Market Drawdown > 7% ({signals['index_drawdown']}%)")
-
-    # 3. Interest Rates (Using Bond Yields as proxy if Rates stable)
-    if signals.get('interest_rates_trend') == 'UP': 
-        score += 1
-        reasons.append("Interest Rates Rising")
-
-    # 4. Bond Yields
-    if signals.get('bond_yields_trend') == 'UP': 
-        score += 1
-        reasons.append("Bond Yields Rising")
-
-    # 5. Commodity (Oil)
-    if signals.get('oil_prices_trend') == 'UP': 
-        score += 1
-        reasons.append("Oil Prices Rising")
-        
-    # Classification
-    if score <= 1: 
-        regime = "NORMAL"
-    elif score == 2: 
-        regime = "ELEVATED_VOLATILITY"
-    elif score == 3: 
-        regime = "TIGHT_LIQUIDITY"
-    else: 
-        regime = "RISK_OFF"
-        
-    return regime, reasons
+    if bits is None:
+        bits = signal_bits(signals)
+    label, reasons = _regime_for_bits(bits)
+    return label, list(reasons)
 
 MACRO_SECTOR_MAP = {
     "INTEREST_RATES_UP": {
@@ -205,31 +145,51 @@ MACRO_SECTOR_MAP = {
     }
 }
 
-def get_market_context():
-    signals = get_macro_signals()
-    regime, reasons = determine_regime(signals)
-    
-    # Simple logic to determine active impacts based on signals
+def _build_impacts(bits):
+    """Active sector impacts for a signal bitmask (evaluated once per mask at import)."""
     active_impacts = {}
     
     # If VIX is high, everything is stressed
-    if signals.get('vix', 0) > 20:
+    if bits & VIX_HIGH:
          active_impacts["General"] = "High Volatility affects all beta assets"
 
-    if signals.get('interest_rates_trend') == 'UP' or signals.get('bond_yields_trend') == 'UP':
+    if bits & (RATES_UP | YIELDS_UP):
         active_impacts.update(MACRO_SECTOR_MAP["INTEREST_RATES_UP"])
         
-    if signals.get('oil_prices_trend') == 'UP':
+    if bits & OIL_UP:
         active_impacts.update(MACRO_SECTOR_MAP["OIL_UP"])
         
     # Default message if no specific major stress
-    if not active_impacts and regime == "NORMAL":
+    if not active_impacts and _regime_for_bits(bits)[0] == "NORMAL":
         active_impacts = {"General": "Macro environment is stable."}
 
+    return active_impacts
+
+IMPACTS_BY_BITS = tuple(MappingProxyType(_build_impacts(bits)) for bits in range(OIL_UP << 1))
+
+def _build_market_context(signals):
+    bits = signal_bits(signals)
+    regime, reasons = _regime_for_bits(bits)
+
+    # Nested values are read-only too: the whole context is shared across requests
     return {
         "regime": regime,
         "score": 0, 
         "reasons": reasons,
-        "signals": signals,
-        "impact_map": active_impacts
+        "signals": MappingProxyType(signals),
+        "impact_map": IMPACTS_BY_BITS[bits]
     }
+
+def get_market_context():
+    # Check cache first
+    cached = market_cache.get()
+    if cached:
+        return cached
+    
+    # Fetch live (one thread per TTL window; the rest wait and reuse it)
+    with market_cache._lock:
+        cached = market_cache.get()
+        if cached:
+            return cached
+        market_cache.set(_build_market_context(fetch_live_signals()))
+        return market_cache.data
@@ -26,3 +26,24 @@ class AIAnalysisResponse(BaseModel):
 
 class AIRequest(BaseModel):
     question: Optional[str] = None
+
+class MarketSignals(BaseModel):
+    model_config = {"frozen": True}
+
+    vix: float
+    index_drawdown: float
+    interest_rates_trend: str
+    bond_yields_trend: str
+    oil_prices_trend: str
+    market_index: float
+    is_simulated: bool
+
+class MarketContextResponse(BaseModel):
+    model_config = {"frozen": True}
+
+    regime: str
+    score: int
+    reasons: List[str]
+    signals: MarketSignals
+    impact_map: Dict[str, str]
+    timestamp: str
@@ -1,10 +1,29 @@
+import heapq
+from bisect import bisect_right
+
+# Risk curves: (breakpoints, points), linearly interpolated and clamped at the ends
+SECTOR_RISK_CURVE = ((20, 30, 40), (5, 15, 30))              # top sector %
+CONCENTRATION_RISK_CURVE = ((0.05, 0.10, 0.20), (8, 18, 28))  # HHI of stock weights
+DIVERSIFICATION_RISK_CURVE = ((10, 15, 25), (18, 12, 5))      # effective holdings (1/HHI)
+
+def _interp(x, curve):
+    """Piecewise-linear lookup (same semantics as numpy.interp)."""
+    xp, fp = curve
+    if x <= xp[0]:
+        return fp[0]
+    if x >= xp[-1]:
+        return fp[-1]
+    i = bisect_right(xp, x)
+    x0, x1, y0, y1 = xp[i - 1], xp[i], fp[i - 1], fp[i]
+    return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
 def calculate_risk_score(portfolio: dict) -> dict:
     """
     Calculates a Production-Grade Risk Score (0-100).
     Formula Breakdown:
-    - Sector Concentration (35%)
-    - Top Holdings Concentration (30%)
-    - Diversification Count (20%)
+    - Sector Concentration (35%): top sector weight
+    - Stock Concentration (30%): Herfindahl-Hirschman Index (HHI) of holding weights
+    - Diversification (20%): effective number of holdings (1 / HHI)
     - Drawdown Sensitivity (15%)
     """
     
@@ -14,37 +33,27 @@ def calculate_risk_score(portfolio: dict) -> dict:
     holdings_count = portfolio.get('holdings_count', 0)
     total_value = portfolio.get('total_value', 1)
     
+    values = [h['value'] for h in holdings]
+    weights = [v / total_value for v in values] if total_value > 0 else []
+    hhi = sum(w * w for w in weights)
+    effective_n = 1.0 / hhi if hhi > 0 else 0.0
+    
     # 1. Sector Risk (35%)
     # Logic: High sector exposure = High risk
-    top_sector_pct = max(sector_alloc.values()) if sector_alloc else 0
-    if top_sector_pct <= 20:
-        sector_risk = 5
-    elif top_sector_pct <= 30:
-        sector_risk = 15
-    else:
-        sector_risk = 30 # Max penalty for >30% concentration
+    top_sector, top_sector_pct = max(sector_alloc.items(), key=lambda kv: kv[1]) if sector_alloc else (None, 0)
+    sector_risk = round(_interp(top_sector_pct, SECTOR_RISK_CURVE))
 
     # 2. Concentration Risk (30%)
-    # Logic: Top 5 holdings dominance
-    sorted_holdings = sorted(holdings, key=lambda x: x['value'], reverse=True)
-    top_5_val = sum(h['value'] for h in sorted_holdings[:5])
-    top_5_pct = (top_5_val / total_value * 100) if total_value > 0 else 0
+    # Logic: Weight dominance across all holdings (HHI)
+    concentration_risk = round(_interp(hhi, CONCENTRATION_RISK_CURVE))
     
-    if top_5_pct <= 35:
-        concentration_risk = 8
-    elif top_5_pct <= 45:
-        concentration_risk = 18
-    else:
-        concentration_risk = 28
+    # Top 5 holdings share (explainability)
+    top_5_val = sum(heapq.nlargest(5, values))
+    top_5_pct = (top_5_val / total_value * 100) if total_value > 0 else 0
 
     # 3. Diversification Risk (20%)
-    # Logic: Few stocks < 15 is risky
-    if holdings_count >= 25:
-        diversification_risk = 5
-    elif holdings_count >= 15:
-        diversification_risk = 12
-    else:
-        diversification_risk = 18
+    # Logic: Fewer than ~15 equally weighted positions is risky
+    diversification_risk = round(_interp(effective_n, DIVERSIFICATION_RISK_CURVE))
 
     # 4. Drawdown Sensitivity (15%)
     # Proxy: Combine sector and concentration risk
@@ -64,14 +73,13 @@ def calculate_risk_score(portfolio: dict) -> dict:
     # Explainability (Reasons)
     reasons = []
     if top_sector_pct > 25:
-        max_sec = max(sector_alloc, key=sector_alloc.get)
-        reasons.append(f"{max_sec} sector exposure at {round(top_sector_pct)}%")
+        reasons.append(f"{top_sector} sector exposure at {round(top_sector_pct)}%")
     
     if top_5_pct > 40:
         reasons.append(f"Top 5 stocks control {round(top_5_pct)}% of portfolio")
         
-    if holdings_count < 15:
-        reasons.append(f"Low diversification ({holdings_count} holdings)")
+    if effective_n < 15:
+        reasons.append(f"Low diversification (effectively {effective_n:.1f} equal-weight holdings)")
         
     if not reasons:
         reasons.append("Balanced portfolio structure")
@@ -83,6 +91,8 @@ def calculate_risk_score(portfolio: dict) -> dict:
         "metrics": {
             "top_sector_pct": round(top_sector_pct, 2),
             "top_5_stock_pct": round(top_5_pct, 2),
+            "hhi": round(hhi, 4),
+            "effective_holdings": round(effective_n, 1),
             "holdings_count": holdings_count
         }
     }
@@ -96,8 +106,9 @@ def check_concentration_alerts(portfolio: dict) -> list:
     if total_val == 0: return []
 
     # Check Single Stock Concentration > 15%
+    scale = 100.0 / total_val
     for h in portfolio.get('holdings', []):
-        pct = (h['value'] / total_val) * 100
+        pct = h['value'] * scale
         if pct > 15:
             alerts.append({
                 "type": "stock",
@@ -1,9 +1,14 @@
-from apscheduler.schedulers.background import BackgroundScheduler
 from zerodha import get_portfolio_summary
 from ai_brain import analyze_portfolio
+from zoneinfo import ZoneInfo
+import asyncio
 import datetime
 
-scheduler = BackgroundScheduler()
+# Daily run time, in market (IST) time
+TZ = ZoneInfo("Asia/Kolkata")
+RUN_AT = datetime.time(hour=9, minute=20)
+
+_task = None
 
 def daily_job():
     print(f"[{datetime.datetime.now()}] Running Daily Portfolio Analysis...")
@@ -11,14 +16,34 @@ def daily_job():
         portfolio = get_portfolio_summary()
         # In a real app, we would save this insight to the database.
         # For now, we just print it to demonstrate the flow.
-        insight = analyze_portfolio(portfolio)
+        insight = asyncio.run(analyze_portfolio(portfolio))
         print("DAILY AI INSIGHT GENERATED:")
-        print(insight.get("analysis", "No analysis generated."))
+        print(insight or "No analysis generated.")
     except Exception as e:
         print(f"Error in daily job: {e}")
 
+def _next_run_after(now):
+    nxt = now.replace(hour=RUN_AT.hour, minute=RUN_AT.minute, second=0, microsecond=0)
+    if nxt <= now:
+        nxt += datetime.timedelta(days=1)
+    return nxt
+
+async def _scheduler():
+    target = _next_run_after(datetime.datetime.now(TZ))
+    while True:
+        # A ~24h sleep can wake a little early; keep sleeping until the target is reached
+        while (delay := (target - datetime.datetime.now(TZ)).total_seconds()) > 0:
+            await asyncio.sleep(delay)
+        try:
+            await asyncio.to_thread(daily_job)
+        except Exception as e:
+            print(f"Error in scheduler: {e}")
+        # Advance from the previous target, not from "now", so each day runs exactly once
+        target = max(target + datetime.timedelta(days=1), _next_run_after(datetime.datetime.now(TZ)))
+
 def start_scheduler():
-    # schedule for 9:20 AM daily
-    scheduler.add_job(daily_job, "cron", hour=9, minute=20)
-    scheduler.start()
-    print("Scheduler started. Daily analysis set for 09:20 AM.")
+    # Must be called from the running event loop (FastAPI startup)
+    global _task
+    if _task is None:
+        _task = asyncio.get_running_loop().create_task(_scheduler())
+    print("Scheduler started. Daily analysis set for 09:20 AM IST.")
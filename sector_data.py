@@ -97,8 +97,18 @@ SECTOR_MAP = {
     "LIQUIDCASE": "Liquid Fund",
 }
 
+# Compact sector ids: lets hot loops aggregate into a flat list instead of a str-keyed dict
+SECTOR_NAMES = tuple(sorted(set(SECTOR_MAP.values()) | {"Other"}))
+_SECTOR_ID = {name: i for i, name in enumerate(SECTOR_NAMES)}
+_SYMBOL_TO_ID = {symbol: _SECTOR_ID[name] for symbol, name in SECTOR_MAP.items()}
+OTHER_ID = _SECTOR_ID["Other"]
+
+def get_sector_id(symbol: str) -> int:
+    """Returns the index into SECTOR_NAMES for a given symbol (OTHER_ID if unknown)."""
+    # Handle cases like 'TCS-EQ' or just 'TCS'
+    clean_symbol, _, _ = symbol.partition('-')
+    return _SYMBOL_TO_ID.get(clean_symbol, OTHER_ID)
+
 def get_sector(symbol: str) -> str:
     """Returns the sector for a given symbol, or 'Other' if unknown."""
-    # Handle cases like 'TCS-EQ' or just 'TCS'
-    clean_symbol = symbol.split('-')[0]
-    return SECTOR_MAP.get(clean_symbol, "Other")
+    return SECTOR_NAMES[get_sector_id(symbol)]
@@ -1,6 +1,8 @@
+import asyncio
+import datetime
 import requests
 import random
-import math
+from ttl_cache import TTLCache
 
 # --- SCORING WEIGHTS ---
 WEIGHTS = {
@@ -10,6 +12,26 @@ WEIGHTS = {
     "sentiment": 0.10
 }
 
+# --- SCORING TABLES ---
+# Buckets are indexed by summing threshold comparisons (branch-free, same cut-offs)
+ARCHETYPES = (
+    # (name, base bias, technical score range)
+    ("WEAK", -0.40, (20, 45)),
+    ("AVG", 0.0, (40, 60)),
+    ("STRONG", 0.40, (65, 90)),
+)
+REV_GROWTH_POINTS = (-10, 0, 20)     # < 0% | 0-15% | > 15%
+PROFIT_MARGIN_POINTS = (-5, 0, 15)   # < 5% | 5-15% | > 15%
+VERDICTS = ("AVOID", "HOLD", "BUY")  # <= 45 | 46-69 | >= 70
+
+def _draw_int(u, lo, hi):
+    """Maps a uniform draw in [0, 1) to an int in [lo, hi] (like randint, without extra RNG calls)."""
+    return lo + int(u * (hi - lo + 1))
+
+# Shared HTTP session: reuses the Yahoo TCP/TLS connection across lookups
+session = requests.Session()
+session.headers.update({'User-Agent': 'Mozilla/5.0'})
+
 def get_latest_price(symbol):
     """
     Optional: Try to get real price via simple JSON endpoint.
@@ -18,71 +40,103 @@ def get_latest_price(symbol):
         # Append .NS for NSE
         ticker = symbol if ("." in symbol or "=" in symbol) else f"{symbol}.NS"
         url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}?interval=1d&range=1d"
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        r = requests.get(url, headers=headers, timeout=2)
+        r = session.get(url, timeout=2)
         data = r.json()
         price = data['chart']['result'][0]['meta']['regularMarketPrice']
         return price
     except:
         return None
 
+# Max parallel Yahoo lookups per batch (keeps us under their rate limits)
+BATCH_CONCURRENCY = 8
+
+# --- INTELLIGENCE CACHE ---
+# Keyed on (symbol, trading day): daily bars only move once per session.
+INTEL_CACHE_TTL = 3600  # seconds
+INTEL_CACHE_MAXSIZE = 512
+_intel_cache = TTLCache(ttl=INTEL_CACHE_TTL, maxsize=INTEL_CACHE_MAXSIZE)
+
+def clear_intelligence_cache():
+    _intel_cache.clear()
+
 def get_stock_intelligence(symbol):
     """
     Main entry point for stock analysis.
     Uses Deterministic Simulation (Lightweight) to ensure Vercel compatibility.
     """
+    key = (symbol, datetime.date.today())
+    cached = _intel_cache.get(key)
+    if cached:
+        return cached
+
     print(f"Fetching intelligence for: {symbol}")
+    result = _simulate_intelligence(symbol, get_latest_price(symbol))
+    _intel_cache.set(key, result)
+    return result
 
+async def get_stock_intelligence_batch(symbols):
+    """
+    Batch entry point: fetches uncached prices concurrently, then scores each symbol.
+    """
+    today = datetime.date.today()
+    results = {s: _intel_cache.get((s, today)) for s in symbols}
+    missing = [s for s, r in results.items() if r is None]
+
+    if missing:
+        print(f"Fetching intelligence for: {', '.join(missing)}")
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def fetch_price(symbol):
+            async with semaphore:
+                return await asyncio.to_thread(get_latest_price, symbol)
+
+        prices = await asyncio.gather(*(fetch_price(s) for s in missing))
+        for symbol, price in zip(missing, prices):
+            results[symbol] = _simulate_intelligence(symbol, price)
+            _intel_cache.set((symbol, today), results[symbol])
+
+    return [results[s] for s in symbols]
+
+def _simulate_intelligence(symbol, real_price):
+    """Scores a symbol. `real_price` is the live quote, or None to simulate one."""
     # --- DETERMINISTIC SIMULATION ---
     # Generate consistent data based on symbol hash so it feels functional
     # This removes the need for 200MB+ dependencies (pandas, numpy)
     
     seed_val = sum(ord(c) for c in symbol)
-    random.seed(seed_val)
+    rng = random.Random(seed_val)  # Per-call generator: no shared global state across requests
+    
+    # All draws up front, so the sequence does not depend on whether a real price was found
+    archetype_roll, price_u, rev_u, margin_u, tech_u, risk_u, sent_u, conf_u = [rng.random() for _ in range(8)]
     
     # 1. Determine Archetype
     # 0 = Weak (AVOID), 1 = Average (HOLD), 2 = Strong (BUY)
-    archetype_roll = random.random()
-    
-    if archetype_roll < 0.33:
-        archetype = "WEAK"
-        base_bias = -0.40
-    elif archetype_roll < 0.66:
-        archetype = "AVG"
-        base_bias = 0.0
-    else:
-        archetype = "STRONG"
-        base_bias = 0.40
+    archetype, base_bias, tech_range = ARCHETYPES[(archetype_roll >= 0.33) + (archetype_roll >= 0.66)]
         
     # Price: Try real, else sim
-    real_price = get_latest_price(symbol)
-    sim_price = real_price if real_price else float(random.randint(500, 3000))
+    sim_price = real_price if real_price else float(_draw_int(price_u, 500, 3000))
     
     # Sim Info (Applied Bias)
-    rev_growth = random.uniform(-0.10, 0.40) + base_bias
-    profit_margin = random.uniform(0.02, 0.30) + (base_bias * 0.5)
+    rev_growth = -0.10 + 0.50 * rev_u + base_bias
+    profit_margin = 0.02 + 0.28 * margin_u + (base_bias * 0.5)
     
     # Score Calculations (Pure Math)
     
     # Fundamental
-    fund_score = 50
-    if rev_growth > 0.15: fund_score += 20
-    elif rev_growth < 0: fund_score -= 10
-    
-    if profit_margin > 0.15: fund_score += 15
-    elif profit_margin < 0.05: fund_score -= 5
+    fund_score = (
+        50
+        + REV_GROWTH_POINTS[(rev_growth >= 0) + (rev_growth > 0.15)]
+        + PROFIT_MARGIN_POINTS[(profit_margin >= 0.05) + (profit_margin > 0.15)]
+    )
     
     # Technical (Simulated based on archetype)
-    tech_score = 50
-    if archetype == "STRONG": tech_score = random.randint(65, 90)
-    elif archetype == "WEAK": tech_score = random.randint(20, 45)
-    else: tech_score = random.randint(40, 60)
+    tech_score = _draw_int(tech_u, *tech_range)
     
     # Risk (Simulated)
-    risk_score = random.randint(30, 90)
+    risk_score = _draw_int(risk_u, 30, 90)
     
     # Sentiment
-    sent_score = int(random.randint(40, 90) + (base_bias * 20))
+    sent_score = int(_draw_int(sent_u, 40, 90) + (base_bias * 20))
     sent_score = max(0, min(100, sent_score))
     
     # Limit Scores
@@ -102,17 +156,15 @@ def get_stock_intelligence(symbol):
     ai_score = max(0, min(100, ai_score))
     
     # Verdict
-    if ai_score >= 70: bias = "BUY"
-    elif ai_score <= 45: bias = "AVOID"
-    else: bias = "HOLD"
+    bias = VERDICTS[(ai_score > 45) + (ai_score >= 70)]
     
     # Confidence
-    algo_conf = random.uniform(0.70, 0.95)
+    algo_conf = 0.70 + 0.25 * conf_u
     
     # Reasoning
     reasons = []
     if rev_growth > 0.15: reasons.append(f"Strong Rev Growth ({int(rev_growth*100)}%)")
-    if rev_growth < 0: reasons.append(f"Declining Revenue")
+    if rev_growth < 0: reasons.append("Declining Revenue")
     
     if tech_score > 60: reasons.append("Bullish Technical Trend")
     if tech_score < 40: reasons.append("Bearish Price Structure")
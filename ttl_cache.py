@@ -0,0 +1,40 @@
+import time
+import threading
+from dataclasses import dataclass, field
+
+# --- SHARED TTL CACHE ---
+@dataclass(slots=True)
+class TTLCache:
+    """Small keyed cache with a per-entry TTL; evicts expired entries, then the oldest (thread-safe)."""
+    ttl: float  # seconds
+    maxsize: int
+    _data: dict = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry and (time.monotonic() - entry[0] < self.ttl):
+            return entry[1]
+        return None
+
+    def set(self, key, value):
+        with self._lock:
+            now = time.monotonic()
+            # Re-insert so the dict stays ordered oldest -> newest by store time
+            self._data.pop(key, None)
+            if len(self._data) >= self.maxsize:
+                # Drop expired entries from the front, else the single oldest live one
+                expired = []
+                for old_key, (stored, _) in self._data.items():
+                    if now - stored < self.ttl:
+                        break
+                    expired.append(old_key)
+                for old_key in expired:
+                    del self._data[old_key]
+                if len(self._data) >= self.maxsize:
+                    self._data.pop(next(iter(self._data)))
+            self._data[key] = (now, value)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -1,39 +1,53 @@
 import os
 import openai
+from concurrent.futures import ThreadPoolExecutor
 from kiteconnect import KiteConnect
-from dotenv import load_dotenv
 
-load_dotenv()
-
-results = []
+# Local dev reads .env; on Vercel the host injects env vars, so skip the file parse
+if not os.getenv("VERCEL"):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
 
 # 1. Check OpenAI
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    results.append("❌ OpenAI API Key: MISSING from .env")
-else:
-    openai.api_key = api_key
-    try:
-        # Simple call to check auth
-        openai.models.list()
-        results.append("✅ OpenAI API Key: VALID")
-    except Exception as e:
-        results.append(f"❌ OpenAI API Key: INVALID\n   Error: {str(e)}")
+def check_openai():
+    results = []
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        results.append("❌ OpenAI API Key: MISSING from .env")
+    else:
+        openai.api_key = api_key
+        try:
+            # Simple call to check auth
+            openai.models.list()
+            results.append("✅ OpenAI API Key: VALID")
+        except Exception as e:
+            results.append(f"❌ OpenAI API Key: INVALID\n   Error: {str(e)}")
+    return results
 
 # 2. Check Zerodha
-kite_key = os.getenv("KITE_API_KEY")
-kite_secret = os.getenv("KITE_API_SECRET")
+def check_kite():
+    results = []
+    kite_key = os.getenv("KITE_API_KEY")
 
-if not kite_key:
-    results.append("❌ Zerodha API Key: MISSING")
-else:
-    try:
-        kite = KiteConnect(api_key=kite_key)
-        login_url = kite.login_url()
-        results.append(f"✅ Zerodha API Key: SEEMS VALID (Generated Login URL)")
-        results.append(f"   Login URL: {login_url}")
-    except Exception as e:
-        results.append(f"❌ Zerodha API Key: INVALID\n   Error: {str(e)}")
+    if not kite_key:
+        results.append("❌ Zerodha API Key: MISSING")
+    else:
+        try:
+            kite = KiteConnect(api_key=kite_key)
+            login_url = kite.login_url()
+            results.append(f"✅ Zerodha API Key: SEEMS VALID (Generated Login URL)")
+            results.append(f"   Login URL: {login_url}")
+        except Exception as e:
+            results.append(f"❌ Zerodha API Key: INVALID\n   Error: {str(e)}")
+    return results
+
+# Run both probes concurrently; collect in submission order so the file stays stable
+with ThreadPoolExecutor(max_workers=2) as ex:
+    futs = [ex.submit(check_openai), ex.submit(check_kite)]
+    results = [line for f in futs for line in f.result()]
 
 # Save to file
 with open("verify_result.txt", "w") as f:
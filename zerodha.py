@@ -1,9 +1,16 @@
 import os
+import threading
 from kiteconnect import KiteConnect
-from sector_data import get_sector
-from dotenv import load_dotenv
+from sector_data import SECTOR_NAMES, get_sector_id
+from ttl_cache import TTLCache
 
-load_dotenv()
+# Local dev reads .env; on Vercel the host injects env vars, so skip the file parse
+if not os.getenv("VERCEL"):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
 
 # Initialize KiteConnect
 # Note: In a real/production scenario, you'd handle the full OAuth flow.
@@ -16,14 +23,26 @@ load_dotenv()
 kite = KiteConnect(api_key=os.getenv("KITE_API_KEY"))
 TOKEN_FILE = "access_token.txt"
 
+# mtime of the token file last loaded; the file is only re-read when it changes
+_token_mtime = None
+_TOKEN_LOCK = threading.Lock()
+
 def load_token():
+    """Loads the saved token into kite (cheap to call: a stat unless the file changed)."""
+    global _token_mtime
     try:
-        if os.path.exists(TOKEN_FILE):
+        with _TOKEN_LOCK:
+            mtime = os.stat(TOKEN_FILE).st_mtime
+            if mtime == _token_mtime:
+                return
             with open(TOKEN_FILE, "r") as f:
                 token = f.read().strip()
-                if token:
-                    kite.set_access_token(token)
-                    print(f"Loaded access token from {TOKEN_FILE}")
+            _token_mtime = mtime
+            if token:
+                kite.set_access_token(token)
+                print(f"Loaded access token from {TOKEN_FILE}")
+    except FileNotFoundError:
+        pass
     except Exception as e:
         print(f"Error loading token: {e}")
 
@@ -32,21 +51,43 @@ load_token()
 
 def set_access_token(token: str):
     """Sets the access token for the current session and saves it."""
+    global _token_mtime
     kite.set_access_token(token)
-    try:
-        with open(TOKEN_FILE, "w") as f:
-            f.write(token)
-    except Exception as e:
-        print(f"Error saving token: {e}")
+    with _TOKEN_LOCK:
+        try:
+            with open(TOKEN_FILE, "w") as f:
+                f.write(token)
+            _token_mtime = os.stat(TOKEN_FILE).st_mtime
+        except Exception as e:
+            print(f"Error saving token: {e}")
+
+# --- PORTFOLIO CACHE ---
+# Dashboard panels fetch the same holdings back-to-back; reuse them briefly per token.
+PORTFOLIO_CACHE_TTL = 30  # seconds
+PORTFOLIO_CACHE_MAXSIZE = 64
+_portfolio_cache = TTLCache(ttl=PORTFOLIO_CACHE_TTL, maxsize=PORTFOLIO_CACHE_MAXSIZE)
+
+def clear_portfolio_cache():
+    _portfolio_cache.clear()
 
 def get_portfolio_summary(access_token=None) -> dict:
     """
     Fetches positions/holdings using stateless token (Vercel) or global state (Local).
+    Live snapshots are cached per access token for PORTFOLIO_CACHE_TTL seconds.
     """
+    # 0. Reuse a recent snapshot for the same token
+    if not access_token:
+        load_token()  # Pick up a token saved by another worker
+    token = access_token or getattr(kite, 'access_token', None)
+    cached = _portfolio_cache.get(token) if token else None
+    if cached:
+        return cached
+
     # 1. Determine which Kite instance to use
     if access_token:
         try:
             k = KiteConnect(api_key=os.getenv("KITE_API_KEY"))
+            k.reqsession = kite.reqsession  # Reuse the pooled keep-alive connection
             k.set_access_token(access_token)
         except Exception as e:
             print(f"Error initializing stateless kite: {e}")
@@ -74,13 +115,13 @@ def get_portfolio_summary(access_token=None) -> dict:
         total_value = 0.0
         total_unrealized_pnl = 0.0 # Renamed from 'pnl' to avoid confusion with individual stock pnl
         total_day_change = 0.0 # Renamed from 'day_change_total'
-        sector_weights = {}
+        sector_sums = [0.0] * len(SECTOR_NAMES) # Indexed by sector id
+        sector_ids = []
         processed_holdings = []
 
         for h in holdings:
             quantity = h['quantity']
             last_price = h['last_price']
-            average_price = h['average_price']
             tradingsymbol = h['tradingsymbol']
             close_price = h.get('close_price', last_price) # Fallback if close_price is missing
 
@@ -92,27 +133,31 @@ def get_portfolio_summary(access_token=None) -> dict:
             total_value += current_val
             total_unrealized_pnl += stock_unrealized_pnl
             total_day_change += stock_day_change
-            
+
             # Determine Sector
-            sector = get_sector(tradingsymbol)
-            sector_weights[sector] = sector_weights.get(sector, 0.0) + current_val
-            
+            sector_id = get_sector_id(tradingsymbol)
+            sector_sums[sector_id] += current_val
+            sector_ids.append(sector_id)
+
             processed_holdings.append({
                 "tradingsymbol": tradingsymbol,
                 "quantity": quantity,
                 "last_price": last_price,
-                "average_price": average_price,
+                "average_price": h['average_price'],
                 "pnl": round(stock_unrealized_pnl, 2),
                 "day_change": round(stock_day_change, 2),
                 "day_change_percentage": round(stock_day_change_percentage, 2),
                 "value": round(current_val, 2),
-                "sector": sector
+                "sector": SECTOR_NAMES[sector_id]
             })
 
-        sector_percent = {
-            k: round((v / total_value) * 100, 2) if total_value > 0 else 0
-            for k, v in sector_weights.items()
-        }
+        # Sectors actually held, in first-seen order
+        sector_weights = {SECTOR_NAMES[sid]: sector_sums[sid] for sid in dict.fromkeys(sector_ids)}
+
+        if total_value > 0:
+            sector_percent = {k: round((v / total_value) * 100, 2) for k, v in sector_weights.items()}
+        else:
+            sector_percent = {k: 0 for k in sector_weights}
 
         # Calculate overall day change percentage
         # The denominator should be the value at the start of the day (total_value - total_day_change)
@@ -120,7 +165,7 @@ def get_portfolio_summary(access_token=None) -> dict:
         if (total_value - total_day_change) > 0:
             day_change_percentage = (total_day_change / (total_value - total_day_change)) * 100
 
-        return {
+        summary = {
             "total_value": round(total_value, 2),
             "sector_allocation": sector_percent,
             "holdings_count": len(holdings),
@@ -130,6 +175,8 @@ def get_portfolio_summary(access_token=None) -> dict:
             "holdings": processed_holdings,
             "data_source": "LIVE"
         }
+        _portfolio_cache.set(token, summary)
+        return summary
 
     except Exception as e:
         print(f"Error fetching holdings: {e}")